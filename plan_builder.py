@@ -1,13 +1,31 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
+import contextlib
+import functools
+import hashlib
+import importlib.util
 import json
 import os
 import re
+import tempfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import AbstractSet, Any, Callable, Dict, Iterator, List, Sequence, Tuple, TypeVar
 
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speed-up.
+    orjson = None
+
+try:
+    import httpx
+except ImportError:  # httpx is only needed for --raw-http.
+    httpx = None
+
+T = TypeVar("T")
 
 ALLOWED_STATUSES = ["not started", "work in progress", "complete", "to be updated"]
 
@@ -21,8 +39,31 @@ DETAIL_HEADINGS = [
     "## Acceptance Criteria",
 ]
 
+_SLUG_NONALNUM = re.compile(r"[^a-z0-9]+")
+_SLUG_EDGES = re.compile(r"^-+|-+$")
+
+DEFAULT_CONCURRENCY = 8
+
+# Sections per request when --detail-group-size is enabled; keeps a grouped
+# request and its combined output comfortably within token limits.
+MAX_DETAIL_GROUP_SIZE = 10
+
+# The SDK retries 429s and transient errors with exponential backoff; give it
+# more headroom since sections are validated concurrently.
+MAX_RETRIES = 5
+
+# Section files below this size are written with a single unbuffered write.
+UNBUFFERED_WRITE_LIMIT = 4096
 
-@dataclass
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "openai-planner"
+
+RAW_HTTP_TIMEOUT = 120.0
+
+BATCH_POLL_INTERVAL = 30.0
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+@dataclass(slots=True, frozen=True)
 class Section:
     section_id: str
     title: str
@@ -31,18 +72,61 @@ class Section:
     details_markdown: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PlanResult:
     project_title: str
     scope_classification: str
     overview: str
-    sections: List[Section]
+    sections: Tuple[Section, ...]
+
+
+@dataclass(slots=True)
+class PlannerClient:
+    """OpenAI client plus the per-run settings shared by every request.
+
+    Not frozen: the raw HTTP client is dropped for the rest of the run once the
+    endpoint rejects its credentials.
+    """
+
+    client: AsyncOpenAI
+    use_responses_api: bool
+    cache_dir: Path | None = None
+    http: "httpx.AsyncClient | None" = None
+
+    @classmethod
+    def create(
+        cls,
+        client: AsyncOpenAI,
+        cache_dir: Path | None = None,
+        http: "httpx.AsyncClient | None" = None,
+    ) -> "PlannerClient":
+        # Older SDKs lack the Responses API; check once instead of per request.
+        return cls(client=client, use_responses_api=hasattr(client, "responses"), cache_dir=cache_dir, http=http)
+
+
+def build_raw_http_client(client: AsyncOpenAI) -> "httpx.AsyncClient":
+    """Create a reusable HTTP client that talks to the same endpoint as the SDK client."""
+    return httpx.AsyncClient(
+        base_url=str(client.base_url),
+        # HTTP/2 multiplexes concurrent requests over one connection but needs the optional h2 package.
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=RAW_HTTP_TIMEOUT,
+        # Reuse the SDK's own headers (organization, project and any
+        # default_headers) so raw requests are billed and routed the same way.
+        # Newer SDKs add auth per request, so merge auth_headers explicitly.
+        # Unset values are Omit sentinels rather than strings.
+        headers={
+            name: value
+            for name, value in {**client.default_headers, **client.auth_headers}.items()
+            if isinstance(value, str)
+        },
+    )
 
 
 def slugify(value: str) -> str:
     value = value.strip().lower()
-    value = re.sub(r"[^a-z0-9]+", "-", value)
-    value = re.sub(r"^-+|-+$", "", value)
+    value = _SLUG_NONALNUM.sub("-", value)
+    value = _SLUG_EDGES.sub("", value)
     return value or "section"
 
 
@@ -50,11 +134,33 @@ def load_input_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
+def _json_loads(data: str | bytes) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only
+    # need to handle the stdlib exception.
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value)
+
+
+def _json_dumps_bytes(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value).encode("utf-8")
+
+
 def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
+@functools.cache
 def build_schema() -> Dict[str, Any]:
+    # Built once and shared; callers must treat the result as read-only.
     return {
         "name": "overview_plan",
         "schema": {
@@ -86,23 +192,74 @@ def build_schema() -> Dict[str, Any]:
     }
 
 
-def build_detail_prompt(section_title: str) -> str:
+def build_detail_prompt() -> str:
+    # Kept free of per-section content so every detail request shares the same
+    # prefix and benefits from the API's automatic prompt caching.
     headings = "\n".join(DETAIL_HEADINGS)
     return (
         "You are validating and enriching a detailed implementation plan section. "
         "Keep the structure and headings exactly as shown below. "
         "Fill in missing details, remove contradictions, and ensure the plan is actionable. "
         "Return the full updated section in Markdown, preserving the headings.\n\n"
-        f"Required headings:\n{headings}\n\n"
-        f"Section title: {section_title}"
+        f"Required headings:\n{headings}"
     )
 
 
-def normalize_detail_markdown(section_title: str, content: str) -> str:
-    if content.strip().startswith("# Section"):
-        return content.strip() + "\n"
+def build_detail_group_prompt() -> str:
+    return (
+        build_detail_prompt() + "\n\n"
+        "You will receive several sections, each introduced by its section id. "
+        "Validate each one independently and return JSON with one entry per section, "
+        "echoing its id and giving the full updated section Markdown in refined_markdown."
+    )
+
+
+@functools.cache
+def build_detail_group_schema() -> Dict[str, Any]:
+    # Built once and shared; callers must treat the result as read-only.
+    return {
+        "name": "refined_sections",
+        "schema": {
+            "type": "object",
+            "additionalProperties": False,
+            "properties": {
+                "sections": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "additionalProperties": False,
+                        "properties": {
+                            "id": {"type": "string"},
+                            "refined_markdown": {"type": "string"},
+                        },
+                        "required": ["id", "refined_markdown"],
+                    },
+                },
+            },
+            "required": ["sections"],
+        },
+        "strict": True,
+    }
+
 
+def build_detail_input(section_title: str, detail_text: str) -> str:
+    return f"Section title: {section_title}\n\n{detail_text}"
+
+
+def is_well_formed(details_markdown: str) -> bool:
+    """Return True when the markdown already has every required heading, in section form."""
+    stripped = details_markdown.strip()
+    if not stripped.startswith("# Section"):
+        return False
+    lines = {line.strip() for line in stripped.splitlines()}
+    return all(heading in lines for heading in DETAIL_HEADINGS)
+
+
+def normalize_detail_markdown(section_title: str, content: str) -> str:
     body = content.strip()
+    if body.startswith("# Section"):
+        return body + "\n"
+
     return (
         f"# Section\n"
         f"{section_title}\n\n"
@@ -117,6 +274,8 @@ def normalize_detail_markdown(section_title: str, content: str) -> str:
 
 
 def parse_plan(data: Dict[str, Any]) -> PlanResult:
+    # The Chat Completions fallback only requests a JSON object and does not
+    # enforce the schema, so field types are normalized here.
     sections = []
     for item in data.get("sections", []):
         sections.append(
@@ -132,64 +291,208 @@ def parse_plan(data: Dict[str, Any]) -> PlanResult:
         project_title=str(data["project_title"]),
         scope_classification=str(data["scope_classification"]),
         overview=str(data["overview"]),
-        sections=sections,
+        sections=tuple(sections),
     )
 
 
-def write_overview(plan: PlanResult, output_path: Path) -> None:
-    lines = [
-        f"# {plan.project_title}",
-        "",
-        f"Scope classification: {plan.scope_classification}",
-        "",
-        "## Overview",
-        plan.overview,
-        "",
-        "## Sections",
-        "",
-    ]
-    for section in plan.sections:
-        lines.extend(
-            [
-                f"### {section.section_id}: {section.title}",
-                f"Status: {section.status}",
-                "",
-                section.summary,
-                "",
-            ]
+def iter_overview_markdown(plan: PlanResult) -> Iterator[str]:
+    yield f"# {plan.project_title}\n\n"
+    yield f"Scope classification: {plan.scope_classification}\n\n"
+    yield f"## Overview\n{plan.overview}\n\n"
+    yield "## Sections\n"
+    last = len(plan.sections) - 1
+    for index, section in enumerate(plan.sections):
+        chunk = (
+            f"\n### {section.section_id}: {section.title}\n"
+            f"Status: {section.status}\n\n"
+            f"{section.summary}\n"
         )
-    output_path.write_text("\n".join(lines).strip() + "\n", encoding="utf-8")
-
-
-def write_section_detail(section: Section, output_dir: Path) -> Path:
-    filename = f"{section.section_id}-{slugify(section.title)}.md"
-    path = output_dir / filename
-    content = normalize_detail_markdown(section.title, section.details_markdown)
-    path.write_text(content, encoding="utf-8")
-    return path
-
-
-def _create_text_response(client: OpenAI, model: str, instructions: str, user_input: str, json_schema: Dict[str, Any] | None = None) -> str:
-    if hasattr(client, "responses"):
-        kwargs: Dict[str, Any] = {
-            "model": model,
-            "instructions": instructions,
-            "input": user_input,
-        }
-        if json_schema is not None:
-            kwargs["text"] = {"format": {"type": "json_schema", **json_schema}}
-        response = client.responses.create(**kwargs)
-        if not response.output_text:
+        # The file ends right after the last section, without trailing blank lines.
+        yield chunk.rstrip() + "\n" if index == last else chunk
+
+
+def write_overview(plan: PlanResult, output_path: Path) -> None:
+    with output_path.open("w", encoding="utf-8", buffering=1 << 20) as handle:
+        handle.writelines(iter_overview_markdown(plan))
+
+
+def section_filename(section: Section) -> str:
+    return f"{section.section_id}-{slugify(section.title)}.md"
+
+
+def build_section_detail(section: Section) -> str:
+    return normalize_detail_markdown(section.title, section.details_markdown)
+
+
+def section_path(sections_dir: str, section: Section) -> str:
+    # Plain string paths avoid building a Path object per section.
+    return os.path.join(sections_dir, section_filename(section))
+
+
+def write_section_file(path: str, content: str) -> None:
+    data = content.encode("utf-8")
+    buffering = 0 if len(data) < UNBUFFERED_WRITE_LIMIT else -1
+    with open(path, "wb", buffering=buffering) as handle:
+        handle.write(data)
+
+
+def _build_response_kwargs(model: str, instructions: str, user_input: str, json_schema: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {
+        "model": model,
+        "instructions": instructions,
+        "input": user_input,
+    }
+    if json_schema is not None:
+        kwargs["text"] = {"format": {"type": "json_schema", **json_schema}}
+    return kwargs
+
+
+def _extract_output_text(body: Dict[str, Any]) -> str:
+    """Collect the output text from a raw Responses API payload."""
+    parts = []
+    for item in body.get("output", []):
+        if item.get("type") != "message":
+            continue
+        for content in item.get("content", []):
+            if content.get("type") == "output_text":
+                parts.append(content.get("text", ""))
+    return "".join(parts)
+
+
+def _cache_key(model: str, instructions: str, user_input: str, json_schema: Dict[str, Any] | None) -> str:
+    payload = {
+        "model": model,
+        "instructions": instructions,
+        "user_input": user_input,
+        "json_schema": json_schema,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _read_cached_response(cache_dir: Path, key: str) -> str | None:
+    path = cache_dir / f"{key}.json"
+    try:
+        return _json_loads(path.read_bytes())["output_text"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_cached_response(cache_dir: Path, key: str, output_text: str) -> None:
+    ensure_dir(cache_dir)
+    # Write to a temporary file first so concurrent readers never see a partial entry.
+    with tempfile.NamedTemporaryFile("wb", dir=cache_dir, suffix=".tmp", delete=False) as handle:
+        handle.write(_json_dumps_bytes({"output_text": output_text}))
+    os.replace(handle.name, cache_dir / f"{key}.json")
+
+
+async def _create_text_response(
+    planner: PlannerClient,
+    model: str,
+    instructions: str,
+    user_input: str,
+    json_schema: Dict[str, Any] | None = None,
+) -> str:
+    return await _create_parsed_response(planner, model, instructions, user_input, json_schema, lambda text: text)
+
+
+async def _create_parsed_response(
+    planner: PlannerClient,
+    model: str,
+    instructions: str,
+    user_input: str,
+    json_schema: Dict[str, Any] | None,
+    parse: Callable[[str], T],
+) -> T:
+    """Request (or reuse) a response and return it parsed.
+
+    Output is only cached once ``parse`` accepts it, so a malformed reply is
+    never replayed on later runs.
+    """
+    # Requests never override sampling parameters, so identical inputs are
+    # treated as cacheable.
+    cache_dir = planner.cache_dir
+    key = None
+    if cache_dir is not None:
+        key = _cache_key(model, instructions, user_input, json_schema)
+        cached = _read_cached_response(cache_dir, key)
+        if cached is not None:
+            try:
+                return parse(cached)
+            except (RuntimeError, ValueError, KeyError, TypeError):
+                pass  # Unusable entry; fetch a fresh response and overwrite it.
+
+    output_text = await _request_text_response(planner, model, instructions, user_input, json_schema)
+    result = parse(output_text)
+    if cache_dir is not None and key is not None:
+        _write_cached_response(cache_dir, key, output_text)
+    return result
+
+
+async def _request_raw_response(planner: PlannerClient, http: "httpx.AsyncClient", kwargs: Dict[str, Any]) -> str | None:
+    """Call the Responses endpoint directly, skipping the SDK's response models.
+
+    Returns None when the request fails in transit or the reply is not a JSON
+    object, so the caller can retry through the SDK.
+    """
+    try:
+        response = await http.post("responses", content=_json_dumps_bytes(kwargs))
+        response.raise_for_status()
+        body = _json_loads(response.content)
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code in (401, 403):
+            # Credentials will not start working mid-run; stop paying for a doomed request each call.
+            planner.http = None
+            print(f"Raw HTTP request was rejected ({exc}); using the SDK for the rest of the run")
+        else:
+            print(f"Raw HTTP request failed ({exc}); retrying through the SDK")
+        return None
+    except (httpx.HTTPError, ValueError) as exc:
+        print(f"Raw HTTP request failed ({exc}); retrying through the SDK")
+        return None
+    if not isinstance(body, dict):
+        print("Raw HTTP response was not a JSON object; retrying through the SDK")
+        return None
+    if body.get("status") != "completed":
+        raise RuntimeError(f"Model response ended with status '{body.get('status')}'.")
+    output_text = _extract_output_text(body)
+    if not output_text:
+        raise RuntimeError("Model returned empty output.")
+    return output_text
+
+
+async def _request_text_response(
+    planner: PlannerClient,
+    model: str,
+    instructions: str,
+    user_input: str,
+    json_schema: Dict[str, Any] | None = None,
+) -> str:
+    client = planner.client
+    if planner.use_responses_api:
+        kwargs = _build_response_kwargs(model, instructions, user_input, json_schema)
+        if planner.http is not None:
+            output_text = await _request_raw_response(planner, planner.http, kwargs)
+            if output_text is not None:
+                return output_text
+
+        async with client.responses.stream(**kwargs) as stream:
+            # The stream only raises on top-level error events, so check how the
+            # response ended to avoid returning (and caching) truncated output.
+            final = await stream.get_final_response()
+        if final.status != "completed":
+            raise RuntimeError(f"Model response ended with status '{final.status}'.")
+        output_text = final.output_text
+        if not output_text:
             raise RuntimeError("Model returned empty output.")
-        return response.output_text
+        return output_text
 
     # Fallback for older SDKs that don't expose Responses API.
     if json_schema is not None:
         user_input = (
-            f"Return JSON that strictly matches this schema:\n{json.dumps(json_schema['schema'])}\n\n"
+            f"Return JSON that strictly matches this schema:\n{_json_dumps(json_schema['schema'])}\n\n"
             + user_input
         )
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "system", "content": instructions},
@@ -198,7 +501,7 @@ def _create_text_response(client: OpenAI, model: str, instructions: str, user_in
             response_format={"type": "json_object"},
         )
     else:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "system", "content": instructions},
@@ -211,23 +514,26 @@ def _create_text_response(client: OpenAI, model: str, instructions: str, user_in
     return content
 
 
-def run_overview_plan(client: OpenAI, model: str, design_text: str) -> PlanResult:
+async def run_overview_plan(planner: PlannerClient, model: str, design_text: str) -> PlanResult:
     schema = build_schema()
     system_prompt = (
         "You are a product and engineering planner. "
         "Design an implementation plan from the given project design. "
         "If scope is unclear, classify the plan as '4 week MVP'. "
-        "Create clear, distinct sections suitable for streamlined implementation."
-    )
-    user_prompt = (
-        "Project design:\n" + design_text.strip() + "\n\n" +
+        "Create clear, distinct sections suitable for streamlined implementation. "
         "Return JSON that matches the provided schema. "
         "Each section must include a concise summary and a detailed markdown plan."
     )
+    # The design is the only variable part, so it goes last to keep the
+    # instructions cacheable as a shared prefix.
+    user_prompt = "Project design:\n" + design_text.strip()
+
+    return await _create_parsed_response(planner, model, system_prompt, user_prompt, schema, parse_overview_output)
 
-    raw = _create_text_response(client, model, system_prompt, user_prompt, schema)
+
+def parse_overview_output(raw: str) -> PlanResult:
     try:
-        data = json.loads(raw)
+        data = _json_loads(raw)
     except json.JSONDecodeError as exc:
         raise RuntimeError(f"Failed to parse model output as JSON: {exc}") from exc
 
@@ -237,48 +543,311 @@ def run_overview_plan(client: OpenAI, model: str, design_text: str) -> PlanResul
     return parse_plan(data)
 
 
-def run_detail_validation(client: OpenAI, model: str, section_title: str, detail_text: str) -> str:
-    prompt = build_detail_prompt(section_title)
-    output = _create_text_response(client, model, prompt, detail_text)
+async def run_detail_validation(planner: PlannerClient, model: str, section_title: str, detail_text: str) -> str:
+    output = await _create_text_response(
+        planner,
+        model,
+        build_detail_prompt(),
+        build_detail_input(section_title, detail_text),
+    )
     return output.strip() + "\n"
 
 
+async def run_detail_batch(planner: PlannerClient, model: str, sections: Sequence[Section]) -> List[str]:
+    """Validate several sections in one request, falling back to per-section calls."""
+    user_input = "\n\n---\n\n".join(
+        f"Section id: {section.section_id}\n" + build_detail_input(section.title, build_section_detail(section))
+        for section in sections
+    )
+    refined: Dict[str, str] = {}
+    try:
+        refined = await _create_parsed_response(
+            planner,
+            model,
+            build_detail_group_prompt(),
+            user_input,
+            build_detail_group_schema(),
+            functools.partial(parse_refined_sections, section_ids={section.section_id for section in sections}),
+        )
+    except (RuntimeError, ValueError, KeyError, TypeError) as exc:
+        print(f"Grouped detail validation failed ({exc}); validating sections individually")
+
+    # Fall back one request at a time: the caller holds a single concurrency
+    # slot for the whole group.
+    for section in sections:
+        if section.section_id not in refined:
+            refined[section.section_id] = await run_detail_validation(
+                planner, model, section.title, build_section_detail(section)
+            )
+    return [refined[section.section_id] for section in sections]
+
+
+def parse_refined_sections(raw: str, section_ids: AbstractSet[str]) -> Dict[str, str]:
+    """Map requested section ids to refined Markdown, ignoring ids that were not requested.
+
+    Raises ValueError when the reply covers none of ``section_ids`` so that an
+    unusable reply is never cached.
+    """
+    refined: Dict[str, str] = {}
+    for item in _json_loads(raw)["sections"]:
+        # Replies from the Chat Completions fallback are not schema-checked.
+        markdown = item["refined_markdown"]
+        if not isinstance(markdown, str):
+            raise ValueError(f"refined_markdown for section {item['id']} is not a string")
+        section_id = str(item["id"])
+        if section_id in section_ids and markdown.strip():
+            refined[section_id] = markdown.strip() + "\n"
+    if not refined:
+        raise ValueError("reply did not cover any requested section")
+    return refined
+
+
+def _batch_record_error(record: Dict[str, Any]) -> str | None:
+    """Describe why a Batch API output record failed, or return None on success."""
+    error = record.get("error")
+    response = record.get("response") or {}
+    if not error and response.get("status_code") == 200:
+        status = (response.get("body") or {}).get("status")
+        if status != "completed":
+            return f"response ended with status '{status}'"
+        return None
+    if not error:
+        body = response.get("body") or {}
+        error = body.get("error") or f"HTTP {response.get('status_code')}"
+    if isinstance(error, dict):
+        return error.get("message") or str(error)
+    return str(error)
+
+
+class BatchDetailValidator:
+    """Validates all section details in a single Batch API job."""
+
+    def __init__(self, client: AsyncOpenAI, model: str, work_dir: Path) -> None:
+        self.client = client
+        self.model = model
+        self.work_dir = work_dir
+
+    def prepare_batch_file(self, sections: Sequence[Section]) -> Path:
+        path = self.work_dir / "detail_batch.jsonl"
+        with path.open("wb") as handle:
+            for section in sections:
+                content = build_section_detail(section)
+                request = {
+                    "custom_id": section.section_id,
+                    "method": "POST",
+                    "url": "/v1/responses",
+                    "body": _build_response_kwargs(
+                        self.model,
+                        build_detail_prompt(),
+                        build_detail_input(section.title, content),
+                    ),
+                }
+                handle.write(_json_dumps_bytes(request) + b"\n")
+        return path
+
+    async def submit_batch(self, batch_file: Path) -> str:
+        with batch_file.open("rb") as handle:
+            uploaded = await self.client.files.create(file=handle, purpose="batch")
+        batch = await self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint="/v1/responses",
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def poll_batch(self, batch_id: str, interval: float = BATCH_POLL_INTERVAL) -> Any:
+        while True:
+            batch = await self.client.batches.retrieve(batch_id)
+            if batch.status in BATCH_TERMINAL_STATUSES:
+                break
+            print(f"Batch {batch_id} is {batch.status}; checking again in {interval:.0f}s")
+            await asyncio.sleep(interval)
+        if batch.status != "completed":
+            # Expired or cancelled batches can still carry partial results.
+            print(f"Batch {batch_id} finished with status '{batch.status}'")
+        return batch
+
+    async def retrieve_results(self, batch: Any) -> Dict[str, str]:
+        """Return refined Markdown for every successful request, reporting the rest."""
+        results: Dict[str, str] = {}
+        failures: Dict[str, str] = {}
+        # Failed requests are written to the error file rather than the output file.
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            # Parse the raw bytes directly rather than decoding the whole file first.
+            for line in content.content.splitlines():
+                if not line.strip():
+                    continue
+                record = _json_loads(line)
+                custom_id = record.get("custom_id")
+                error = _batch_record_error(record)
+                if error is not None:
+                    failures[custom_id] = error
+                    continue
+                text = _extract_output_text(record["response"].get("body") or {})
+                if not text:
+                    failures[custom_id] = "Model returned empty output."
+                    continue
+                results[custom_id] = text.strip() + "\n"
+
+        for custom_id, error in failures.items():
+            print(f"Batch request for section {custom_id} failed: {error}")
+        return results
+
+    async def run(self, sections: Sequence[Section]) -> Dict[str, str]:
+        batch_file = self.prepare_batch_file(sections)
+        try:
+            batch_id = await self.submit_batch(batch_file)
+        finally:
+            batch_file.unlink(missing_ok=True)
+        print(f"Submitted batch {batch_id} with {len(sections)} sections")
+        batch = await self.poll_batch(batch_id)
+        return await self.retrieve_results(batch)
+
+
+async def write_section_files(detail_paths: Sequence[str], contents: Sequence[str]) -> None:
+    await asyncio.gather(
+        *(asyncio.to_thread(write_section_file, path, content) for path, content in zip(detail_paths, contents))
+    )
+
+
+async def process_section_group(
+    planner: PlannerClient,
+    model: str,
+    sections: Sequence[Section],
+    detail_paths: Sequence[str],
+    limiter: asyncio.Semaphore,
+) -> List[Tuple[Section, str]]:
+    async with limiter:
+        if len(sections) == 1:
+            section = sections[0]
+            refined = [await run_detail_validation(planner, model, section.title, build_section_detail(section))]
+        else:
+            refined = await run_detail_batch(planner, model, sections)
+    await write_section_files(detail_paths, refined)
+    return list(zip(sections, detail_paths))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Generate overview and detailed plans from a project design.")
     parser.add_argument("input_file", help="Path to the project design file.")
     parser.add_argument("--output-dir", default="docs", help="Output directory for plan files.")
     parser.add_argument("--overview-model", default="gpt-5.2", help="Model for overview plan generation.")
     parser.add_argument("--detail-model", default="gpt-5-mini", help="Model for detail validation.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of detail validation requests in flight.",
+    )
+    parser.add_argument(
+        "--detail-group-size",
+        type=int,
+        default=1,
+        help=f"Validate up to this many sections per request (1-{MAX_DETAIL_GROUP_SIZE}).",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Validate section details through the Batch API (cheaper, but may take up to 24h).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=str(DEFAULT_CACHE_DIR),
+        help="Directory for cached model responses.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API, ignoring cached responses.")
+    parser.add_argument(
+        "--raw-http",
+        action="store_true",
+        help="Call the Responses API over a shared raw HTTP client, falling back to the SDK on errors.",
+    )
     args = parser.parse_args()
 
+    if args.concurrency < 1:
+        raise SystemExit("--concurrency must be at least 1")
+    if not 1 <= args.detail_group_size <= MAX_DETAIL_GROUP_SIZE:
+        raise SystemExit(f"--detail-group-size must be between 1 and {MAX_DETAIL_GROUP_SIZE}")
+    if args.raw_http and httpx is None:
+        raise SystemExit("--raw-http requires the httpx package (pip install httpx)")
+
     input_path = Path(args.input_file)
     if not input_path.exists():
         raise SystemExit(f"Input file not found: {input_path}")
 
+    asyncio.run(amain(args, input_path))
+
+
+async def amain(args: argparse.Namespace, input_path: Path) -> None:
+    cache_dir = None if args.no_cache else Path(args.cache_dir).expanduser()
     output_dir = Path(args.output_dir)
     sections_dir = output_dir / "sections"
     ensure_dir(sections_dir)
 
     design_text = load_input_text(input_path)
-    client = OpenAI()
-
-    plan = run_overview_plan(client, args.overview_model, design_text)
-
-    overview_path = output_dir / "overview_plan.md"
-    write_overview(plan, overview_path)
-    print(f"Wrote overview: {overview_path}")
-
-    total_sections = len(plan.sections)
-    for index, section in enumerate(plan.sections, start=1):
-        print(f"[{index}/{total_sections}] Generating section: {section.section_id} - {section.title}")
-        detail_path = write_section_detail(section, sections_dir)
-        refined = run_detail_validation(
-            client,
-            args.detail_model,
-            section.title,
-            detail_path.read_text(encoding="utf-8"),
-        )
-        detail_path.write_text(refined, encoding="utf-8")
+    async with AsyncOpenAI(max_retries=MAX_RETRIES) as client, contextlib.AsyncExitStack() as stack:
+        http = await stack.enter_async_context(build_raw_http_client(client)) if args.raw_http else None
+        planner = PlannerClient.create(client, cache_dir, http)
+
+        plan = await run_overview_plan(planner, args.overview_model, design_text)
+
+        overview_path = output_dir / "overview_plan.md"
+        write_overview(plan, overview_path)
+        print(f"Wrote overview: {overview_path}")
+
+        # Sections that already have every required heading skip the detail call.
+        sections_dir_str = os.fspath(sections_dir)
+        ready: List[Tuple[Section, str]] = []
+        pending: List[Tuple[Section, str]] = []
+        for section in plan.sections:
+            target = ready if is_well_formed(section.details_markdown) else pending
+            target.append((section, section_path(sections_dir_str, section)))
+        if ready:
+            await write_section_files(
+                [detail_path for _, detail_path in ready],
+                [build_section_detail(section) for section, _ in ready],
+            )
+            print(f"Skipped validation for {len(ready)} well-formed sections")
+
+        sections = tuple(section for section, _ in pending)
+        detail_paths = [detail_path for _, detail_path in pending]
+        total_sections = len(sections)
+        if args.batch and total_sections:
+            validator = BatchDetailValidator(planner.client, args.detail_model, output_dir)
+            results = await validator.run(sections)
+            done = [(section, path) for section, path in zip(sections, detail_paths) if section.section_id in results]
+            await write_section_files(
+                [detail_path for _, detail_path in done],
+                [results[section.section_id] for section, _ in done],
+            )
+            # Anything the batch did not return is validated with regular requests.
+            remaining = [(section, path) for section, path in zip(sections, detail_paths) if section.section_id not in results]
+            if remaining:
+                print(f"Batch returned no result for {len(remaining)} sections; validating them individually")
+            sections = tuple(section for section, _ in remaining)
+            detail_paths = [detail_path for _, detail_path in remaining]
+            total_sections = len(sections)
+
+        if total_sections:
+            group_size = args.detail_group_size
+            limiter = asyncio.Semaphore(args.concurrency)
+            tasks = [
+                process_section_group(
+                    planner,
+                    args.detail_model,
+                    sections[start:start + group_size],
+                    detail_paths[start:start + group_size],
+                    limiter,
+                )
+                for start in range(0, total_sections, group_size)
+            ]
+            completed = 0
+            for task in asyncio.as_completed(tasks):
+                for section, _ in await task:
+                    completed += 1
+                    print(f"[{completed}/{total_sections}] Generated section: {section.section_id} - {section.title}")
 
     print(f"Wrote {len(plan.sections)} detailed section files in {sections_dir}")
 